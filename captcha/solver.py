@@ -1,57 +1,97 @@
 import logging
+import threading
 import urllib.parse
-import utils
 
 from anticaptchaofficial.hcaptchaproxyless import *
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
 
 logger = logging.getLogger(__name__)
 
 
-def solve_captcha(driver: WebDriver, anticaptcha_api_key: str):
-    logger.info('solving captcha with AntiCaptcha...')
-    solver = hCaptchaProxyless()
-
-    solver.set_website_url(driver.current_url)
-    solver.set_key(anticaptcha_api_key)
-
-    def find_site_key():
+def extract_site_key(driver: WebDriver):
+    try:
         captcha_iframe = driver.find_elements(By.TAG_NAME, 'iframe')[0]
         captcha_iframe_src = captcha_iframe.get_attribute('src')
         parsed_src = urllib.parse.urlparse(captcha_iframe_src)
         parsed_qs = urllib.parse.parse_qs(parsed_src.fragment)
         qs_param = parsed_qs.get('sitekey')
         if not qs_param:
-            raise Exception('sitekey not found yet')
+            return None
         return qs_param[0]
+    except IndexError:
+        return None
+
+
+class PendingCaptchaJob:
+    """
+    Runs the blocking AntiCaptcha solve call on a background thread so
+    that the caller can keep working with the browser while the captcha
+    farm is busy (typically 20-40 seconds).
+    """
+    def __init__(self, solver):
+        self.solver = solver
+        self.solution = None
+        self.error = None
+        self.thread = threading.Thread(target=self._solve)
+        self.thread.setDaemon(True)
+        self.thread.start()
+
+    def _solve(self):
+        try:
+            self.solution = self.solver.solve_and_return_solution()
+        except Exception as err:
+            self.error = err
+
+    def result(self):
+        self.thread.join()
+
+        if self.error is not None:
+            raise self.error
 
-    site_key = utils.retry(find_site_key, retry_period_sec=5.0, retry_count=3)
+        if self.solution == 0:
+            raise RuntimeError('AntiCaptcha failed!')
+
+        return self.solution
+
+
+def submit_captcha(driver: WebDriver, anticaptcha_api_key: str) -> PendingCaptchaJob:
+    solver = hCaptchaProxyless()
+
+    solver.set_website_url(driver.current_url)
+    solver.set_key(anticaptcha_api_key)
+
+    # poll frequently instead of sleeping a fixed amount -- the iframe is
+    # usually ready way before the timeout
+    site_key = WebDriverWait(driver, 15, poll_frequency=0.25).until(
+        extract_site_key, message='captcha iframe with sitekey not found')
 
     solver.set_website_key(site_key)
 
     logger.info('retrieved sitekey: %s' % site_key)
 
-    logger.info('submit the job for AntiCaptcha and wait for result...')
-    solution = solver.solve_and_return_solution()
+    logger.info('submitting the job for AntiCaptcha...')
+    return PendingCaptchaJob(solver)
+
+
+def solve_captcha(driver: WebDriver, anticaptcha_api_key: str):
+    logger.info('solving captcha with AntiCaptcha...')
 
-    if solution == 0:
-        raise RuntimeError('AntiCaptcha failed!')
+    job = submit_captcha(driver, anticaptcha_api_key)
+    solution = job.result()
 
     logger.info('retrieved solution from AntiCaptcha: %s', solution)
 
-    # insert the token into the iframe attribute
-    logger.info('inserting the token into the iframe attributes')
-    for iframe in driver.find_elements(By.TAG_NAME, 'iframe'):
-        driver.execute_script(
-            "arguments[0].setAttribute('data-hcaptcha-response',arguments[1])",
-            iframe, solution)
-
-    logger.info('inserting the token into the textarea')
-    for textarea in driver.find_elements(By.XPATH, '//textarea[@name = "h-captcha-response"]'):
-        driver.execute_script(
-            "arguments[0].textContent = arguments[1]",
-            textarea, solution)
-
-    logger.info('executing callback...')
-    driver.execute_script("window[hcaptchaHandle.callback](arguments[0])", solution)
+    # insert the token into the iframe attributes and textareas and invoke
+    # the callback all in a single round-trip -- per-element execute_script
+    # calls each cost a full WebDriver HTTP round-trip
+    logger.info('inserting the token and executing callback...')
+    driver.execute_script(
+        "var token = arguments[0];"
+        "document.querySelectorAll('iframe').forEach("
+        "  function (iframe) { iframe.setAttribute('data-hcaptcha-response', token); });"
+        "document.querySelectorAll('textarea[name=\"h-captcha-response\"]').forEach("
+        "  function (textarea) { textarea.textContent = token; });"
+        "window[hcaptchaHandle.callback](token);",
+        solution)
@@ -1,44 +1,68 @@
 import argparse
+import base64
 import collections
-import itertools
+import concurrent.futures
+import gzip
 import json
 import logging
 import os.path
 import pickle
+import random
 import re
+import sys
 import time
 from datetime import datetime
 from io import BytesIO
-from typing import List, OrderedDict, Dict, Any
+from typing import List, Dict, Any
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
-import coloredlogs
-import pytz
-import telegram
-import telegram.ext
-import undetected_chromedriver
 from PIL import Image
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
+from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.common.proxy import Proxy, ProxyType
 from selenium.webdriver.firefox.service import Service as FFService
 from selenium.webdriver.remote.webdriver import WebDriver, WebElement
-from selenium.webdriver.support.ui import Select
 
-import captcha.solver
+try:
+    # C-level JSON serializer; worthwhile for the state files which grow
+    # with every tracked month, but strictly optional
+    import orjson
+except ImportError:
+    orjson = None
+
 import utils
 from model import AvailableSlot, SlotsCheckResults
 from proxy_host import ProxyHost
 
+# the alternatives share the "No " prefix and use non-capturing groups --
+# nothing inspects the captures and the engine skips mismatching branches
+# earlier this way
 NO_DATES_MARKER_RE = re.compile(
-    r'(No date\(s\) available for appointment)|'
-    r'(No Appointment slots available)|'
-    r'(No date\(s\) available for current month)|'
-    r'(Error in the application, please contact admin)')
+    r'No (?:date\(s\) available for (?:appointment|current month)|'
+    r'Appointment slots available)|'
+    r'Error in the application, please contact admin')
+
+CAPTCHA_MARKER_TEXT = 'Checking if the site connection is secure'
 
 USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 ' \
              '(KHTML, like Gecko) Chrome/100.0.4896.127 Safari/537.36'
 
+# how long after a captcha sighting the (slower to start) undetected
+# chromedriver keeps being used instead of the stock one
+UNDETECTED_AFTER_CAPTCHA_SEC = 24 * 3600
+
+# chrome arguments which do not depend on runtime parameters, built once
+CHROME_STATIC_ARGS = (
+    f'--user-agent={USER_AGENT}',
+    '--log-level=3',  # disable logs
+    '--start-maximized',
+    # '--window-size=1024,768',
+    '--disable-blink-features',
+    '--disable-blink-features=AutomationControlled',
+)
+
 
 ConfigType = Dict[str, Any]
 
@@ -62,14 +86,23 @@ def get_chrome_driver(
         path: str,
         headless: bool = True,
         scale_factor: float = 2.0,
-        proxy: Proxy = None) -> webdriver.Chrome:
+        proxy: Proxy = None,
+        undetected: bool = True,
+        disable_images: bool = False) -> webdriver.Chrome:
     path = os.path.abspath(path)
 
     options = webdriver.ChromeOptions()
-    options.add_argument(f'--user-agent={USER_AGENT}')
-    options.add_argument('--log-level=3')  # disable logs
-    options.add_argument('--start-maximized')
-    # options.add_argument('--window-size=1024,768')
+    for argument in CHROME_STATIC_ARGS:
+        options.add_argument(argument)
+
+    if disable_images:
+        # the slot check only reads text; skipping images cuts page
+        # weight further, but breaks manual captcha solving (the
+        # hCaptcha challenge is image-based), hence opt-in via config
+        options.add_argument('--blink-settings=imagesEnabled=false')
+        options.add_experimental_option('prefs', {
+            'profile.managed_default_content_settings.images': 2,
+        })
 
     # for some reason setting the DPI "the right way" does not work to get
     # elements screenshots in a good quality... it does work when capturing the
@@ -80,8 +113,6 @@ def get_chrome_driver(
     options.add_argument(f'--high-dpi-support={scale_factor}')
     options.add_argument(f'--force-device-scale-factor={scale_factor}')
 
-    options.add_argument('--disable-blink-features')
-    options.add_argument('--disable-blink-features=AutomationControlled')
     # options.add_experimental_option("excludeSwitches", ["enable-automation"])
     # options.add_experimental_option('useAutomationExtension', False)
 
@@ -96,13 +127,43 @@ def get_chrome_driver(
         options.accept_insecure_certs = True
         options.add_argument('--proxy-server=http://%s' % proxy.httpProxy)
 
-    # driver = webdriver.Chrome(path, options=options)
-    driver = undetected_chromedriver.Chrome(
-        driver_executable_path=path,
-        options=options)
+    if undetected:
+        # imported lazily -- the module patches the chromedriver binary
+        # on import and is only needed on this branch
+        import undetected_chromedriver
+        driver = undetected_chromedriver.Chrome(
+            driver_executable_path=path,
+            options=options)
+    else:
+        # stock Chrome starts noticeably faster -- good enough while the
+        # site is not challenging us
+        driver = webdriver.Chrome(
+            service=ChromeService(path), options=options)
+
+    # remember the scale factor so that screenshot cropping does not
+    # have to re-parse it from the options arguments every time
+    driver._scale_factor = scale_factor
+
+    # analytics, trackers and web fonts contribute nothing to the form
+    # flow -- drop them at the network layer so every navigation ships
+    # fewer bytes; images stay enabled since the hCaptcha widget needs
+    # them for manual solves
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': [
+        '*google-analytics.com*',
+        '*googletagmanager.com*',
+        '*doubleclick.net*',
+        '*facebook.net*',
+        '*.woff',
+        '*.woff2',
+        '*.ttf',
+    ]})
 
     driver.set_page_load_timeout(30)
-    driver.implicitly_wait(10)
+    # do not use implicit waits -- they make every negative lookup (like
+    # the marker/captcha probes) block for the full timeout; the places
+    # which do need to wait use utils.wait_for instead
+    driver.implicitly_wait(0)
 
     return driver
 
@@ -111,7 +172,8 @@ def get_firefox_driver(
         path: str,
         headless: bool = True,
         scale_factor: float = 2.0,
-        proxy: Proxy = None) -> webdriver.Firefox:
+        proxy: Proxy = None,
+        disable_images: bool = False) -> webdriver.Firefox:
     path = os.path.abspath(path)
 
     options = webdriver.FirefoxOptions()
@@ -124,6 +186,17 @@ def get_firefox_driver(
     options.set_preference("dom.webdriver.enabled", False)
     options.set_preference('useAutomationExtension', False)
 
+    if disable_images:
+        # text is all the slot check reads; opt-in via config since the
+        # hCaptcha challenge cannot be solved manually without images
+        options.set_preference('permissions.default.image', 2)
+
+    # skip downloadable fonts, trackers and notification plumbing --
+    # none of it matters for the form flow
+    options.set_preference('gfx.downloadable_fonts.enabled', False)
+    options.set_preference('privacy.trackingprotection.enabled', True)
+    options.set_preference('dom.webnotifications.enabled', False)
+
     service = FFService(path)
 
     driver = webdriver.Firefox(
@@ -136,7 +209,10 @@ def get_firefox_driver(
     driver.set_window_size(1280, 1080)
 
     driver.set_page_load_timeout(30)
-    driver.implicitly_wait(10)
+    # do not use implicit waits -- they make every negative lookup (like
+    # the marker/captcha probes) block for the full timeout; the places
+    # which do need to wait use utils.wait_for instead
+    driver.implicitly_wait(0)
 
     return driver
 
@@ -151,101 +227,235 @@ def get_driver_loader(driver_type: str):
 
 
 def get_time_prefix() -> str:
+    # format by hand -- strftime goes through libc/locale machinery and
+    # this runs for every trace artifact
     now = datetime.now()
-    return now.strftime('%Y-%m-%d %H-%M-%S-%f')
+    return ('%04d-%02d-%02d %02d-%02d-%02d-%06d' % (
+        now.year, now.month, now.day,
+        now.hour, now.minute, now.second, now.microsecond))
 
 
-def get_screenshot_path(name='default') -> str:
-    path = f'./artifacts/screenshots/{get_time_prefix()}-{name}.png'
-    utils.ensure_dir(path)
-    return path
+_artifact_dirs_created = False
 
 
-def save_page_source(page_source, stage) -> None:
-    path = f'./artifacts/pages/{get_time_prefix()}-{stage}.html'
-    utils.ensure_dir(path)
-    with open(path, 'w') as f:
-        f.write(page_source)
+def ensure_artifact_dirs() -> None:
+    # create the output directories once per process instead of paying
+    # the os.makedirs stat syscalls on every artifact write
+    global _artifact_dirs_created
+    if _artifact_dirs_created:
+        return
+    os.makedirs('./artifacts/screenshots', exist_ok=True)
+    os.makedirs('./artifacts/pages', exist_ok=True)
+    _artifact_dirs_created = True
+
 
+def get_screenshot_path(name='default', ext='png') -> str:
+    ensure_artifact_dirs()
+    return f'./artifacts/screenshots/{get_time_prefix()}-{name}.{ext}'
 
-def page_trace(driver: WebDriver, checkpoint: str, screenshot:bool = True) -> None:
-    save_page_source(driver.page_source, checkpoint)
+
+def save_page_source(page_source, stage) -> None:
+    ensure_artifact_dirs()
+    path = f'./artifacts/pages/{get_time_prefix()}-{stage}.html.gz'
+    # the ASP.NET markup (viewstate blobs included) compresses an order
+    # of magnitude; this runs on the background writer thread, so the
+    # compression CPU stays off the WebDriver flow
+    with gzip.open(path, 'wb', compresslevel=5) as f:
+        f.write(page_source.encode('utf-8'))
+
+
+# single background writer so that trace disk I/O (multi-MB HTML dumps
+# and PNGs) does not block the main WebDriver flow
+_trace_writer = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+# None means "follow the log level" (trace when DEBUG logging is on);
+# the "trace" config key overrides this either way at startup
+TRACE_ENABLED = None
+
+
+def page_trace(driver: WebDriver, checkpoint: str, screenshot: bool = True,
+               force: bool = False) -> None:
+    # tracing dumps the full page source and a screenshot to disk on
+    # every checkpoint -- too expensive for the happy path, so only do
+    # it when enabled (or when explicitly forced, e.g. on errors)
+    if not force:
+        enabled = TRACE_ENABLED
+        if enabled is None:
+            enabled = logger.isEnabledFor(logging.DEBUG)
+        if not enabled:
+            return
+
+    # the driver calls have to happen on this thread, only the disk
+    # writes are offloaded; grab just the form container when present --
+    # driver.page_source serializes the entire DOM over the wire while
+    # everything interesting lives under plhMain
+    page_source = driver.execute_script(
+        "var main = document.getElementById('plhMain');"
+        "return main ? main.outerHTML : document.documentElement.outerHTML;")
+    _trace_writer.submit(save_page_source, page_source, checkpoint)
 
     if screenshot:
-        path = get_screenshot_path(checkpoint)
-        driver.save_screenshot(path)
+        screenshot_data, ext = trace_screenshot(driver)
+        _trace_writer.submit(
+            save_image, screenshot_data,
+            get_screenshot_path(checkpoint, ext=ext))
+
+
+def trace_screenshot(driver: WebDriver):
+    """
+    Returns (bytes, extension) for a trace-quality screenshot.  Chrome
+    hands out a lossy JPEG straight from CDP, which is several times
+    smaller than the PNG the WebDriver endpoint encodes -- more than
+    good enough for debugging artifacts.
+    """
+    if hasattr(driver, 'execute_cdp_cmd'):
+        try:
+            result = driver.execute_cdp_cmd(
+                'Page.captureScreenshot', {'format': 'jpeg', 'quality': 60})
+            return base64.b64decode(result['data']), 'jpg'
+        except Exception:
+            logger.debug('CDP screenshot failed, falling back to PNG',
+                         exc_info=True)
+    return driver.get_screenshot_as_png(), 'png'
 
 
 def parse_available_times_in_day(driver: WebDriver) -> List[str]:
-    slots_table = driver.find_element(By.ID, 'plhMain_gvSlot')
-    times = []
-    for row in slots_table.find_elements(By.TAG_NAME, 'tr')[1:]:
-        times.append(row.text)
-    return times
+    utils.wait_for(driver, By.ID, 'plhMain_gvSlot')
+    # read all the rows in one round-trip instead of a .text call (a
+    # separate WebDriver request) per row
+    return driver.execute_script(
+        "return Array.from(document.querySelectorAll('#plhMain_gvSlot tr'))"
+        "  .slice(1).map(function (row) { return row.innerText; });")
+
+
+def parse_available_dates(
+        driver: WebDriver,
+        calendar_element: WebElement = None) -> List[AvailableSlot]:
+    # callers that already located the calendar on the current page can
+    # pass it in to skip a redundant presence wait
+    if calendar_element is None:
+        utils.wait_for(driver, By.ID, 'plhMain_cldAppointment')
+
+    # pull the month header and the open day numbers with a single
+    # script call -- element-by-element reads cost a WebDriver
+    # round-trip apiece
+    month, days = driver.execute_script(
+        "var cal = document.getElementById('plhMain_cldAppointment');"
+        "var month = cal.querySelector('tr').innerText;"
+        "var days = Array.from(cal.querySelectorAll('.OpenDateAllocated a'))"
+        "  .map(function (a) { return parseInt(a.textContent, 10); });"
+        "return [month, days];")
+    month = month.replace('>>', '').replace('<<', '').strip()
+    days = sorted(days)
 
+    available_slots = []
 
-def parse_available_dates(driver: WebDriver) -> List[AvailableSlot]:
-    calendar_element = driver.find_element(By.ID, 'plhMain_cldAppointment')
-    month: str = calendar_element.find_elements(By.TAG_NAME, 'tr')[0].text
-    month = month.replace('>>', '').replace('<<', '').strip()
+    for day in days:
+        # when we navigate to another page the reference to the
+        # found element becomes invalid, so find the day link again
+        day_link = utils.wait_for(
+            driver, By.XPATH,
+            "//td[contains(@class, 'OpenDateAllocated')]"
+            "/a[normalize-space(text())='%d']" % day)
+        day_link.click()
 
-    # day -> slots
-    available_slots = {}
+        times = parse_available_times_in_day(driver)
 
-    # when we navigate to another page the reference to the
-    # found element becomes invalid
-    while True:
-        # update element
-        calendar_element = driver.find_element(By.ID, 'plhMain_cldAppointment')
-        day_elements = calendar_element.find_elements(By.CLASS_NAME, 'OpenDateAllocated')
+        back_link = utils.wait_for(driver, By.ID, 'plhMain_btnBack')
+        back_link.click()
 
-        # try to find not yet parsed day
-        day_element = next((el for el in day_elements if int(el.text) not in available_slots), None)
+        available_slots.extend(AvailableSlot(month, day, time) for time in times)
 
-        if day_element is None:
-            break  # parsed all
+    return available_slots
 
-        day = int(day_element.text)
 
-        day_link = day_element.find_element(By.TAG_NAME, 'a')
-        day_link.click()
+def sorted_list_diff(old: List[int], new: List[int]):
+    """
+    Computes (added, removed) between two sorted lists with a single
+    merge pass; results come out sorted for free.
+    """
+    added, removed = [], []
+    i, j = 0, 0
 
-        times = parse_available_times_in_day(driver)
+    while i < len(old) and j < len(new):
+        if old[i] == new[j]:
+            i += 1
+            j += 1
+        elif old[i] < new[j]:
+            removed.append(old[i])
+            i += 1
+        else:
+            added.append(new[j])
+            j += 1
 
-        back_link = driver.find_element(By.ID, 'plhMain_btnBack')
-        back_link.click()
+    removed.extend(old[i:])
+    added.extend(new[j:])
 
-        available_slots[day] = [AvailableSlot(month, day, time) for time in times]
+    return added, removed
 
-    return list(itertools.chain(*available_slots.values()))
 
+def get_available_dates(slots: List[AvailableSlot]) -> Dict[str, List[int]]:
+    # month -> sorted days; plain dicts keep insertion order, so sorting
+    # the items once on the way out is all the ordering we need
+    days_by_month: Dict[str, set] = {}
+    for slot in slots:
+        days_by_month.setdefault(slot.month, set()).add(slot.day)
+    return {
+        month: sorted(days)
+        for month, days in sorted(days_by_month.items())
+    }
 
-def get_available_slots_diff(baseline: collections.OrderedDict, current: collections.OrderedDict):
-    diff = collections.OrderedDict()
 
-    for month in baseline:
-        removed_dates = set(baseline[month]) - set(current.get(month, []))
-        if removed_dates:
-            diff.setdefault(month, {})['removed'] = sorted(removed_dates)
+def get_available_slots_diff(baseline: Dict[str, List[int]], current: Dict[str, List[int]]):
+    diff = {}
 
-    for month in current:
-        added_dates = set(current[month]) - set(baseline.get(month, []))
-        if added_dates:
-            diff.setdefault(month, {})['added'] = sorted(added_dates)
+    # the day lists are already sorted (see get_available_dates), so a
+    # merge pass beats building sets and re-sorting the differences
+    for month in sorted(set(baseline) | set(current)):
+        added, removed = sorted_list_diff(
+            baseline.get(month, []), current.get(month, []))
+        if removed:
+            diff.setdefault(month, {})['removed'] = removed
+        if added:
+            diff.setdefault(month, {})['added'] = added
 
     return diff
 
 
+def get_page_state(driver: WebDriver) -> Dict[str, Any]:
+    # grab everything the branching below needs in a single round-trip --
+    # probing the marker and the calendar separately costs a WebDriver
+    # call each
+    return driver.execute_script(
+        "var msg = document.getElementById('plhMain_lblMsg');"
+        "return {"
+        "  msg: msg ? msg.textContent : null,"
+        "  has_calendar:"
+        "    !!document.getElementById('plhMain_cldAppointment')"
+        "};")
+
+
+def is_no_dates_message(message_text) -> bool:
+    return bool(message_text and NO_DATES_MARKER_RE.search(message_text))
+
+
 def is_no_dates_available_marker_present(driver: WebDriver):
-    message_span = utils.find_element_safe(driver, By.ID, 'plhMain_lblMsg')
-    return message_span and NO_DATES_MARKER_RE.search(message_span.text)
+    # fetch the message text with a single script call -- find_element plus
+    # a .text read costs two WebDriver round-trips (and an implicit wait
+    # timeout when the span is missing)
+    message_text = driver.execute_script(
+        "var span = document.getElementById('plhMain_lblMsg');"
+        "return span ? span.textContent : null;")
+    return is_no_dates_message(message_text)
 
 
 def is_captcha_screen_present(driver: WebDriver):
-    captcha_marker = utils.find_element_safe(
-        driver, By.XPATH, '//h2[contains(text(), "%s")]' %
-                          'Checking if the site connection is secure')
-    return captcha_marker is not None
+    # probe the body text in one script call -- the contains(text())
+    # XPath variant forced a full-DOM walk plus an extra round-trip
+    return driver.execute_script(
+        "return document.body !== null"
+        "  && document.body.innerText.indexOf(arguments[0]) !== -1;",
+        CAPTCHA_MARKER_TEXT)
 
 
 def element_screenshot(driver: WebDriver, element: WebElement):
@@ -256,34 +466,70 @@ def element_screenshot(driver: WebDriver, element: WebElement):
 
 def element_screenshot_chrome(driver: webdriver.Chrome, element: WebElement):
     # https://stackoverflow.com/questions/39600245/how-to-capture-website-screenshot-in-high-resolution
-    driver.execute_script("arguments[0].scrollIntoView(true);", element)
+    # scroll and measure the element within the same script call; the
+    # location/size properties are a WebDriver round-trip each
+    rect = driver.execute_script(
+        "arguments[0].scrollIntoView(true);"
+        "var rect = arguments[0].getBoundingClientRect();"
+        "return {"
+        "  x: rect.x + window.scrollX, y: rect.y + window.scrollY,"
+        "  viewport_x: rect.x, viewport_y: rect.y,"
+        "  width: rect.width, height: rect.height};",
+        element)
+
+    try:
+        # let Chrome encode only the element region -- a full-page PNG
+        # costs an encode proportional to the whole viewport plus a
+        # decode/crop/encode cycle on our side
+        result = driver.execute_cdp_cmd('Page.captureScreenshot', {
+            'format': 'png',
+            'clip': {
+                'x': rect['x'],
+                'y': rect['y'],
+                'width': rect['width'],
+                'height': rect['height'],
+                'scale': getattr(driver, '_scale_factor', 1.0),
+            },
+            'captureBeyondViewport': True,
+        })
+        return base64.b64decode(result['data'])
+    except Exception:
+        logger.debug(
+            'CDP element screenshot failed, falling back to full-page crop',
+            exc_info=True)
+
     screenshot_png = driver.get_screenshot_as_png()
-    screenshot_img = Image.open(BytesIO(screenshot_png))
 
     win_size = driver.get_window_size()
     win_h, win_w = win_size['height'], win_size['width']
 
-    location, size = element.location_once_scrolled_into_view, element.size
+    # the fallback crops a viewport screenshot, so use viewport-relative
+    # coordinates here
+    x, y = rect['viewport_x'], rect['viewport_y']
+    h, w = rect['height'], rect['width']
 
-    x, y = location['x'], location['y']
-    h, w = size['height'], size['width']
+    # nothing to crop when the element covers the whole window -- return
+    # the original PNG without a decode/encode cycle
+    if h >= win_h and w >= win_w:
+        return screenshot_png
 
     h, w = min(win_h, h), min(win_w, w)
 
-    scale_arg = next(
-        (arg for arg in driver.options.arguments
-         if arg.startswith('--force-device-scale-factor=')), '1.0')
-    scale = float(scale_arg.replace('--force-device-scale-factor=', ''))
+    scale = getattr(driver, '_scale_factor', 1.0)
 
     x = x * scale
     y = y * scale
     w = w * scale
     h = h * scale
 
-    cropped_img = screenshot_img.crop((x, y, x + w, y + h))
+    with BytesIO(screenshot_png) as png_buffer:
+        screenshot_img = Image.open(png_buffer)
+        cropped_img = screenshot_img.crop((x, y, x + w, y + h))
 
     img_bytes = BytesIO()
-    cropped_img.save(img_bytes, format='PNG')
+    # default compression level is noticeably slower with negligible
+    # size difference for UI screenshots
+    cropped_img.save(img_bytes, format='PNG', compress_level=1)
     return img_bytes.getvalue()
 
 
@@ -292,7 +538,22 @@ def save_image(data: bytes, path: str):
         f.write(data)
 
 
-def check_available_slots(driver: WebDriver, config: ConfigType):
+def to_jpeg(image_bytes: bytes, quality: int = 75) -> bytes:
+    # calendar screenshots compress poorly as PNG; JPEG at this quality
+    # uploads several times faster and Telegram recompresses incoming
+    # photos anyway
+    with BytesIO(image_bytes) as buffer:
+        image = Image.open(buffer)
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        out = BytesIO()
+        image.save(out, format='JPEG', quality=quality, optimize=True)
+    return out.getvalue()
+
+
+def check_available_slots(driver: WebDriver, config: ConfigType,
+                          state: Dict[str, Any] = None,
+                          on_slots_detected=None):
     scheduling_url = require_config_key(config, 'scheduling_url')
     scheduling_city = require_config_key(config, 'scheduling_city')
     scheduling_category = require_config_key(config, 'scheduling_category')
@@ -302,40 +563,53 @@ def check_available_slots(driver: WebDriver, config: ConfigType):
     page_trace(driver, 'loaded')
 
     if is_captcha_screen_present(driver):
+        if state is not None:
+            # remembered so the next driver launch knows stealth is needed
+            state['last_saw_captcha_ts'] = time.time()
+
         anticaptcha_api_key = config.get('anticaptcha_api_key')
         if anticaptcha_api_key:
+            # lazy import -- pulls in the anticaptcha client stack which
+            # is only needed once a captcha actually shows up
+            import captcha.solver
             captcha.solver.solve_captcha(driver, anticaptcha_api_key)
         else:
-            # pause to solve manually
-            logger.warning('Detected captcha screen, adding 1 minute wait time. '
+            # pause to solve manually, but keep polling so we resume as
+            # soon as the captcha screen goes away instead of always
+            # burning the full minute
+            logger.warning('Detected captcha screen, waiting up to 1 minute. '
                            'Manually solve the captcha (disable headless mode '
                            'if required), then the cookies will be saved for the next '
                            'session')
-            captcha_time = 60
-            captcha_report_period = 10
-            for captcha_report_round in range(captcha_time // captcha_report_period - 1):
-                leftover = captcha_time - captcha_report_round * captcha_report_period
-                logger.warning('%s seconds left...', leftover)
-                time.sleep(10)
-
-    schedule_link = driver.find_element(By.LINK_TEXT, 'Schedule Appointment')
+            captcha_poll_period = 2.0
+            deadline = time.monotonic() + 60
+            last_report = time.monotonic()
+            while time.monotonic() < deadline:
+                if not is_captcha_screen_present(driver):
+                    logger.warning('captcha screen is gone, continuing')
+                    break
+                if time.monotonic() - last_report >= 10:
+                    last_report = time.monotonic()
+                    logger.warning('%.0f seconds left...',
+                                   deadline - time.monotonic())
+                time.sleep(captcha_poll_period)
+
+    schedule_link = utils.wait_for(driver, By.LINK_TEXT, 'Schedule Appointment')
     schedule_link.click()
 
     page_trace(driver, 'schedule-clicked')
 
     if scheduling_city:
-        city_picker = driver.find_element(By.ID, 'plhMain_cboVAC')
-        city_picker_select = Select(city_picker)
-        city_picker_select.select_by_visible_text(scheduling_city)
+        utils.wait_for(driver, By.ID, 'plhMain_cboVAC')
+        utils.select_fast(driver, 'plhMain_cboVAC', scheduling_city)
 
         city_submit_btn = driver.find_element(By.ID, 'plhMain_btnSubmit')
         city_submit_btn.click()
 
         page_trace(driver, 'city-submitted')
 
-    category_picker = driver.find_element(By.ID, 'plhMain_cboVisaCategory')
-    category_picker_select = Select(category_picker)
-    category_picker_select.select_by_visible_text(scheduling_category)
+    utils.wait_for(driver, By.ID, 'plhMain_cboVisaCategory')
+    utils.select_fast(driver, 'plhMain_cboVisaCategory', scheduling_category)
 
     continue_btn = driver.find_element(By.ID, 'plhMain_btnSubmit')
     continue_btn.click()
@@ -349,27 +623,44 @@ def check_available_slots(driver: WebDriver, config: ConfigType):
 
     logger.debug('Looks like there are some slots, getting the calendar')
 
+    if on_slots_detected:
+        # give the caller a chance to fire a quick heads-up now -- the
+        # form fill and calendar traversal below take seconds more
+        try:
+            on_slots_detected()
+        except Exception:
+            logger.exception('on_slots_detected callback failed')
+
     # slots seem to be found, get the calendar
-    given_name_textbox = driver.find_element(By.ID, 'plhMain_repAppVisaDetails_tbxFName_0')
-    surname_textbox = driver.find_element(By.ID, 'plhMain_repAppVisaDetails_tbxLName_0')
-    contact_number_textbox = driver.find_element(By.ID, 'plhMain_repAppVisaDetails_tbxContactNumber_0')
-    email_textbox = driver.find_element(By.ID, 'plhMain_repAppVisaDetails_tbxEmailAddress_0')
+    utils.wait_for(driver, By.ID, 'plhMain_repAppVisaDetails_tbxFName_0')
+
+    # resolve all the form elements in a single round-trip instead of a
+    # find_element call (and HTTP hop) per field
+    (given_name_textbox, surname_textbox, contact_number_textbox,
+     email_textbox, submit_btn) = driver.execute_script(
+        "return arguments[0].map("
+        "  function (id) { return document.getElementById(id); });",
+        ['plhMain_repAppVisaDetails_tbxFName_0',
+         'plhMain_repAppVisaDetails_tbxLName_0',
+         'plhMain_repAppVisaDetails_tbxContactNumber_0',
+         'plhMain_repAppVisaDetails_tbxEmailAddress_0',
+         'plhMain_btnSubmit'])
 
     given_name_textbox.send_keys('GIVENNAME')
     surname_textbox.send_keys('SURNAME')
     contact_number_textbox.send_keys('79170000000')
     email_textbox.send_keys('tracker@gmail.com')
-    confirm_picker = driver.find_element(By.ID, 'plhMain_cboConfirmation')
-    confirm_picker_select = Select(confirm_picker)
-    confirm_picker_select.select_by_visible_text('I confirm the above statement')
+    utils.select_fast(
+        driver, 'plhMain_cboConfirmation', 'I confirm the above statement')
 
-    submit_btn = driver.find_element(By.ID, 'plhMain_btnSubmit')
     submit_btn.click()
 
     page_trace(driver, 'calendar')
 
-    # no dates marker can be present on later stage too
-    if is_no_dates_available_marker_present(driver):
+    # no dates marker can be present on later stage too; one probe also
+    # tells whether the calendar has rendered already
+    page_state = get_page_state(driver)
+    if is_no_dates_message(page_state['msg']):
         logger.info('No slots found')
         page_screenshot = driver.get_screenshot_as_png()
         return SlotsCheckResults([], screenshots=[page_screenshot])
@@ -378,18 +669,26 @@ def check_available_slots(driver: WebDriver, config: ConfigType):
     available_slots = []
 
     while True:
-        calendar_table = driver.find_element(By.ID, 'plhMain_cldAppointment')
+        if page_state['has_calendar']:
+            # the probe already saw the calendar on this page -- grab
+            # the element directly, no polling machinery needed
+            calendar_table = driver.find_element(
+                By.ID, 'plhMain_cldAppointment')
+        else:
+            calendar_table = utils.wait_for(
+                driver, By.ID, 'plhMain_cldAppointment')
 
         calendar_screenshot = element_screenshot(driver, calendar_table)
         calendar_screenshots.append(calendar_screenshot)
 
-        month_slots = parse_available_dates(driver)
+        month_slots = parse_available_dates(driver, calendar_table)
         available_slots.extend(month_slots)
 
-        next_month_link = driver.find_element(By.LINK_TEXT, '>>')
+        next_month_link = utils.wait_for(driver, By.LINK_TEXT, '>>')
         next_month_link.click()
 
-        if is_no_dates_available_marker_present(driver):
+        page_state = get_page_state(driver)
+        if is_no_dates_message(page_state['msg']):
             break
 
         page_trace(driver, 'calendar')
@@ -402,10 +701,12 @@ def check_available_slots(driver: WebDriver, config: ConfigType):
 def read_config(path: str) -> ConfigType:
     logger.debug('reading configuration at %s', path)
 
-    with open(path, 'r') as f:
-        data = json.loads(f.read())
-        logger.debug('config: %s', data)
-        return data
+    with open(path, 'rb') as f:
+        raw = f.read()
+
+    data = orjson.loads(raw) if orjson else json.loads(raw)
+    logger.debug('config: %s', data)
+    return data
 
 
 def require_config_key(config: Dict[str, Any], config_key: str) -> Any:
@@ -429,84 +730,212 @@ class JsonFileStateProvider(StateProviderBase):
     def get(self) -> Dict[str, Any]:
         if not os.path.exists(self.path):
             return {}
-        with open(self.path, 'r') as f:
-            return json.loads(f.read())
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        return orjson.loads(data) if orjson else json.loads(data)
 
     def save(self, state: Dict[str, Any]):
-        with open(self.path, 'w') as f:
-            f.write(json.dumps(state))
+        if orjson:
+            serialized = orjson.dumps(state)
+        else:
+            serialized = json.dumps(
+                state, separators=(',', ':')).encode('utf-8')
 
+        # write to a temp file and rename so that a crash mid-write can
+        # not leave a corrupt state file behind
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(serialized)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
 
-def save_cookies(driver: WebDriver) -> None:
-    cookies = driver.get_cookies()
-    with open('cookies.dat', 'wb+') as f:
-        pickle.dump(cookies, f)
+
+COOKIES_PATH = 'cookies.json'
+LEGACY_COOKIES_PATH = 'cookies.dat'
 
 
-def load_cookies(driver: WebDriver) -> None:
-    if not os.path.exists('cookies.dat'):
+def save_cookies(driver: WebDriver, path: str = COOKIES_PATH) -> None:
+    cookies = driver.get_cookies()
+    # tmp-and-replace so concurrent monitor workers (or a crash) can
+    # never leave a truncated file behind for the next reader
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(cookies, f)
+    os.replace(tmp_path, path)
+
+
+def load_cookies(driver: WebDriver, url: str,
+                 path: str = COOKIES_PATH) -> None:
+    # cookies returned by the driver are plain JSON-serializable dicts,
+    # so there is no reason to pay pickle costs (and risks) for them
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            cookies = json.load(f)
+    elif path == COOKIES_PATH and os.path.exists(LEGACY_COOKIES_PATH):
+        # one-time migration from the legacy pickle format
+        with open(LEGACY_COOKIES_PATH, 'rb') as f:
+            cookies = pickle.load(f)
+        os.remove(LEGACY_COOKIES_PATH)
+    else:
         logger.info('cookies file not found')
         return
 
-    with open('cookies.dat', 'rb') as f:
-        cookies = pickle.load(f)
+    if hasattr(driver, 'execute_cdp_cmd'):
+        # chrome can inject cookies directly, saving the full priming
+        # page load which add_cookie would otherwise require
         for cookie in cookies:
-            driver.add_cookie(cookie)
+            params = {
+                key: value for key, value in cookie.items()
+                if key in ('name', 'value', 'domain', 'path',
+                           'secure', 'httpOnly', 'sameSite')
+            }
+            if 'expiry' in cookie:
+                params['expires'] = cookie['expiry']
+            driver.execute_cdp_cmd('Network.setCookie', params)
+        return
+
+    # setting cookie requires current context to be matching domain
+    driver.get(url)
+    for cookie in cookies:
+        driver.add_cookie(cookie)
+
+
+def should_use_undetected_driver(
+        config: ConfigType, state_provider: StateProviderBase = None) -> bool:
+    use_undetected = config.get('use_undetected')  # absent means "auto"
+
+    if use_undetected is not None:
+        return use_undetected
+
+    if state_provider is None:
+        return True
+
+    # fall back to stock Chrome while the site has not been challenging
+    # us for a while -- the undetected variant patches the binary on
+    # startup and takes noticeably longer to launch
+    state = state_provider.get()
+    last_saw_captcha_ts = state.get('last_saw_captcha_ts', 0)
+    return time.time() - last_saw_captcha_ts < UNDETECTED_AFTER_CAPTCHA_SEC
+
+
+def start_session(
+        driver_params: DriverParameters, config: ConfigType,
+        proxy_host: ProxyHost, proxy_port: int = 8080,
+        state_provider: StateProviderBase = None) -> WebDriver:
+    driver_path = require_config_key(config, 'driver_path')
+    driver_type = config.get('driver_type', 'firefox').lower()
+    driver_loader_fn = get_driver_loader(driver_type)
+
+    proxy_host.start(port=proxy_port)
+
+    proxy_config = Proxy()
+    proxy_config.proxyType = ProxyType.MANUAL
+    proxy_config.httpProxy = 'localhost:%d' % proxy_port
+    proxy_config.sslProxy = 'localhost:%d' % proxy_port
+
+    params = driver_params.as_dict()
+    params['proxy'] = proxy_config
+    params['disable_images'] = config.get('disable_images', False)
+
+    if driver_type == 'chrome':
+        params['undetected'] = should_use_undetected_driver(
+            config, state_provider)
+
+    return driver_loader_fn(driver_path, **params)
+
+
+def close_session(driver: WebDriver, proxy_host: ProxyHost) -> None:
+    logger.debug('closing driver...')
+    if driver:
+        try:
+            driver.close()
+        except Exception:
+            logger.exception('error closing driver')
+    logger.debug('stopping proxy...')
+    proxy_host.stop()
+
+
+_telegram_bots: Dict[str, Any] = {}
+
+
+def get_telegram_bot(token: str) -> 'telegram.ext.ExtBot':
+    # the bot holds a urllib3 connection pool to the Telegram API, so
+    # constructing one per check drops the keep-alive connection and
+    # pays a fresh TLS handshake on every notification/status edit
+    import telegram.ext
+
+    bot = _telegram_bots.get(token)
+    if bot is None:
+        bot = telegram.ext.ExtBot(token, defaults=telegram.ext.Defaults(
+            timeout=10,
+        ))
+        _telegram_bots[token] = bot
+    return bot
 
 
 def check_once(
         driver_params: DriverParameters, config: ConfigType,
-        state_provider: StateProviderBase) -> None:
+        state_provider: StateProviderBase, driver: WebDriver = None) -> None:
+    import telegram  # deferred together with the rest of the bot stack
+
     logger.debug('starting')
 
-    driver = None
-    proxy_host = ProxyHost()
+    # when no driver is injected the session is created (and torn down)
+    # here; monitor mode injects a long-lived one to avoid paying the
+    # browser startup cost on every check
+    owns_session = driver is None
+    proxy_host = ProxyHost() if owns_session else None
 
-    try:
-        driver_path = require_config_key(config, 'driver_path')
-        driver_type = config.get('driver_type', 'firefox').lower()
-        driver_loader_fn = get_driver_loader(driver_type)
+    # per-target override -- parallel workers must not share (and race
+    # on) one cookie jar, see monitor()
+    cookies_path = config.get('cookies_path', COOKIES_PATH)
+
+    state = None
 
+    try:
         scheduling_url = require_config_key(config, 'scheduling_url')
         scheduling_tz = config.get('scheduling_tz', 'Europe/Moscow')
 
-        proxy_port = 8080
-        proxy_host.start(port=proxy_port)
-
-        proxy_config = Proxy()
-        proxy_config.proxyType = ProxyType.MANUAL
-        proxy_config.httpProxy = 'localhost:%d' % proxy_port
-        proxy_config.sslProxy = 'localhost:%d' % proxy_port
-
-        params = driver_params.as_dict()
-        params['proxy'] = proxy_config
-
-        driver = driver_loader_fn(driver_path, **params)
+        if owns_session:
+            driver = start_session(
+                driver_params, config, proxy_host,
+                state_provider=state_provider)
 
         logger.info('loading cookies...')
-        # setting cookie requires current context to be matching domain
-        driver.get(scheduling_url)
-        load_cookies(driver)
+        load_cookies(driver, scheduling_url, cookies_path)
         logger.info('loaded cookies')
 
         telegram_chat_id = require_config_key(config, 'telegram_chat_id')
         telegram_bot_token = require_config_key(config, 'telegram_bot_api_token')
 
-        bot = telegram.ext.ExtBot(telegram_bot_token, defaults=telegram.ext.Defaults(
-            timeout=10,
-        ))
+        bot = get_telegram_bot(telegram_bot_token)
 
         state = state_provider.get()
-        result = check_available_slots(driver, config=config)
 
-        def get_available_dates(slots: List[AvailableSlot]) -> OrderedDict[str, List[int]]:
-            result = collections.defaultdict(set)  # month -> days
-            for slot in slots:
-                result[slot.month].add(slot.day)
-            return collections.OrderedDict(
-                sorted([(k, sorted(v)) for k, v in result.items()], key=lambda x: x[0]))
+        # when the last check saw nothing, send a bare heads-up the
+        # moment availability is detected -- the detailed notification
+        # with screenshots lands only after the calendar traversal
+        on_slots_detected = None
+        if not state.get('available_slots'):
+            def on_slots_detected():
+                bot.send_message(
+                    chat_id=telegram_chat_id,
+                    text='🔥 Slots detected, collecting details...',
+                )
+
+        result = check_available_slots(
+            driver, config=config, state=state,
+            on_slots_detected=on_slots_detected)
 
         available_dates = get_available_dates(result.slots)
+
+        # (month, day) -> formatted times, so the notification loop does
+        # not re-scan the whole slot list for every added day
+        slot_times_by_day = collections.defaultdict(list)
+        for slot in result.slots:
+            slot_times_by_day[(slot.month, slot.day)].append(slot.formatted_time)
+
         prev_available_slots = [
             AvailableSlot.from_dict(x)
             for x in state.get('available_slots', [])
@@ -524,7 +953,7 @@ def check_once(
 
                 media = []
                 for screenshot in result.screenshots:
-                    media.append(telegram.InputMediaPhoto(screenshot))
+                    media.append(telegram.InputMediaPhoto(to_jpeg(screenshot)))
 
                 # add the diff
                 diff = get_available_slots_diff(prev_available_dates, available_dates)
@@ -535,11 +964,7 @@ def check_once(
                         diff_description += '❌ %s %s\n' % (day, month)
                     for day in diff[month].get('added', []):
                         added_something = True
-                        available_times = [
-                            slot.formatted_time
-                            for slot in result.slots
-                            if slot.month == month and slot.day == day
-                        ]
+                        available_times = slot_times_by_day[(month, day)]
                         available_slot_count = len(available_times)
                         assert available_slot_count > 0
                         diff_description += '🟢 %s %s (%s %s)\n' % (
@@ -572,10 +997,11 @@ def check_once(
 
         status_message_id = config.get('telegram_status_message_id')
         if status_message_id:
-            tz = pytz.timezone(scheduling_tz)
-
-            if tz is None:
-                logger.debug('All timezones: %s', pytz.all_timezones)
+            # zoneinfo is stdlib and lazy-loads a single zone instead of
+            # the whole IANA database like pytz did
+            try:
+                tz = ZoneInfo(scheduling_tz)
+            except ZoneInfoNotFoundError:
                 raise Exception('Unable to find timezone "%s"' % scheduling_tz)
 
             now = datetime.now(tz)
@@ -593,40 +1019,159 @@ def check_once(
         logger.info('check completed')
 
         logger.info('saving cookies')
-        save_cookies(driver)
+        save_cookies(driver, cookies_path)
         logger.info('cookies saved')
     except Exception:
         if driver:
-            page_trace(driver, 'error', screenshot=True)
+            page_trace(driver, 'error', screenshot=True, force=True)
 
             if not is_captcha_screen_present(driver):
                 logger.info('saving cookies even with error occurred, because '
                             'captcha screen seems to be not present')
-                save_cookies(driver)
+                save_cookies(driver, cookies_path)
+
+        if state is not None:
+            # persist the in-memory mutations (notably the captcha
+            # sighting timestamp) -- an unsolved captcha fails the check
+            # and without this the next launch would pick the stock
+            # driver again and fail the same way forever
+            state_provider.save(state)
+
         logger.exception('An error occurred')
         raise  # reraise exception
     finally:
-        logger.debug('closing driver...')
-        if driver:
-            driver.close()
-        logger.debug('stopping proxy...')
-        proxy_host.stop()
-
-
-def monitor(
-        period_seconds: int, driver_params: DriverParameters, config: ConfigType,
-        state_provider: StateProviderBase) -> None:
-    while True:
+        if owns_session:
+            close_session(driver, proxy_host)
+
+
+class MonitorWorker:
+    """
+    Holds the long-lived session for a single monitored target so that
+    it can be reused (and recycled) across checks.
+    """
+    def __init__(
+            self, driver_params: DriverParameters, config: ConfigType,
+            state_provider: StateProviderBase, proxy_port: int):
+        self.driver_params = driver_params
+        self.config = config
+        self.state_provider = state_provider
+        self.proxy_port = proxy_port
+        self.proxy_host = ProxyHost()
+        self.driver = None
+        self.checks_completed = 0
+
+    def check(self, recycle_after_checks: int) -> bool:
         try:
+            if self.driver is None:
+                self.driver = start_session(
+                    self.driver_params, self.config, self.proxy_host,
+                    proxy_port=self.proxy_port,
+                    state_provider=self.state_provider)
+
             check_once(
-                driver_params=driver_params,
-                config=config,
-                state_provider=state_provider,
+                driver_params=self.driver_params,
+                config=self.config,
+                state_provider=self.state_provider,
+                driver=self.driver,
             )
+
+            self.checks_completed += 1
+            if self.checks_completed % recycle_after_checks == 0:
+                logger.info(
+                    'recycling driver after %s checks', self.checks_completed)
+                self.close()
+            return True
         except Exception:
-            # swallow exceptions, they are logged anyway already
-            pass
-        time.sleep(period_seconds)
+            # swallow exceptions, they are logged anyway already;
+            # restart the session to recover from whatever state the
+            # browser was left in
+            self.close()
+            return False
+
+    def close(self) -> None:
+        close_session(self.driver, self.proxy_host)
+        self.driver = None
+
+
+def get_target_configs(config: ConfigType) -> List[ConfigType]:
+    # "targets" optionally holds a list of per-target overrides (city,
+    # category, url, state_path...) applied on top of the shared config
+    targets = config.get('targets')
+    if not targets:
+        return [config]
+    return [dict(config, **target) for target in targets]
+
+
+def monitor(
+        period_seconds: int, driver_params: DriverParameters, config: ConfigType,
+        state_provider: StateProviderBase,
+        recycle_after_checks: int = 20) -> None:
+    # keep the browsers and the proxies alive across checks -- starting
+    # a driver takes seconds; check all configured targets in parallel,
+    # one session per target (selenium releases the GIL while waiting
+    # on the wire, so threads give near-linear scaling here)
+    target_configs = get_target_configs(config)
+    base_state_path = getattr(state_provider, 'path', 'state.json')
+
+    workers = []
+    for target_idx, target_config in enumerate(target_configs):
+        if target_idx == 0 and 'state_path' not in target_config:
+            target_state_provider = state_provider
+        else:
+            target_state_provider = JsonFileStateProvider(
+                target_config.get(
+                    'state_path', '%s.%d' % (base_state_path, target_idx)))
+        if target_idx > 0:
+            # same treatment as the state files: targets checking
+            # different URLs must not overwrite each other's session
+            # cookies every cycle
+            target_config.setdefault(
+                'cookies_path', '%s.%d' % (COOKIES_PATH, target_idx))
+        workers.append(MonitorWorker(
+            driver_params, target_config, target_state_provider,
+            proxy_port=8080 + target_idx))
+
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=len(workers))
+
+    consecutive_failures = 0
+
+    try:
+        while True:
+            cycle_started = time.monotonic()
+
+            futures = [
+                executor.submit(worker.check, recycle_after_checks)
+                for worker in workers
+            ]
+            results = [future.result() for future in futures]
+
+            if all(results):
+                consecutive_failures = 0
+                # jitter the healthy cadence a little as well -- checks
+                # landing at an exact fixed interval are an easy
+                # automation fingerprint for the site
+                delay = period_seconds + random.uniform(
+                    0, period_seconds * 0.1)
+            else:
+                # back off exponentially with full jitter so that a
+                # down or rate-limiting site is not hammered at a fixed
+                # cadence (capped at 4x the regular period)
+                consecutive_failures += 1
+                delay = random.uniform(0, min(
+                    period_seconds * 2 ** consecutive_failures,
+                    period_seconds * 4))
+                logger.info(
+                    '%s consecutive failed cycles, next check in %.0f seconds',
+                    consecutive_failures, delay)
+
+            # schedule relative to the cycle start so the check duration
+            # does not drift the cadence (a slow cycle eats into its own
+            # delay instead of postponing every following check)
+            time.sleep(max(0.0, cycle_started + delay - time.monotonic()))
+    finally:
+        for worker in workers:
+            worker.close()
+        executor.shutdown(wait=False)
 
 
 def bot_test(driver_params: DriverParameters, config: ConfigType) -> None:
@@ -668,7 +1213,14 @@ if __name__ == '__main__':
         filename='app.log',
         format='%(asctime)s %(levelname)s:%(message)s',
         level=logging.DEBUG)
-    coloredlogs.install(level=logging.DEBUG)
+
+    # colored console output only makes sense on an interactive terminal;
+    # when running as a service the file handler above is the single sink
+    # and every record is formatted exactly once
+    console_logging = sys.stderr.isatty()
+    if console_logging:
+        import coloredlogs
+        coloredlogs.install(level=logging.DEBUG)
 
     parser = argparse.ArgumentParser()
     parser.add_argument('--log-level', type=str, default=None, required=False)
@@ -697,7 +1249,8 @@ if __name__ == '__main__':
 
     root_logger = logging.getLogger()
     root_logger.setLevel(log_level)
-    coloredlogs.set_level(log_level)
+    if console_logging:
+        coloredlogs.set_level(log_level)
 
     logger.info('parsed args: %s', args)
 
@@ -709,7 +1262,9 @@ if __name__ == '__main__':
     config = read_config(args.config_path)
     state_provider = JsonFileStateProvider(args.state_path)
 
-    if args.command in ['check', 'monitor']:
+    TRACE_ENABLED = config.get('trace', TRACE_ENABLED)
+
+    if args.command == 'check':
         check_once(
             driver_params=driver_params,
             config=config,
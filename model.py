@@ -3,19 +3,25 @@ from typing import List
 
 # time is represented by string HHMM (4 characters)
 class AvailableSlot:
+    # no per-instance __dict__ -- hundreds of these can be alive at once
+    # in monitor mode and they are pure value objects
+    __slots__ = ('month', 'day', 'time', 'formatted_time', '_key')
+
     def __init__(self, month: str, day: int, time: str):
         self.month = month
         self.day = day
         self.time = time
-
-    @property
-    def formatted_time(self):
-        return self.time[:2] + ':' + self.time[2:]
+        # built once -- equality/hashing run a lot when slot lists are
+        # diffed and deduped, and formatted_time is read per slot when
+        # rendering notifications
+        self.formatted_time = time[:2] + ':' + time[2:]
+        self._key = (month, day, time)
 
     def __eq__(self, other):
-        return (self.month == other.month and
-                self.day == other.day and
-                self.time == other.time)
+        return self._key == other._key
+
+    def __hash__(self):
+        return hash(self._key)
 
     def __repr__(self):
         return f'<{self.month} on {self.day} at {self.time}>'
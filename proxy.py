@@ -25,17 +25,35 @@ class InjectScript:
         ctx.log.info('loading script from %s' % script_path)
         with open(script_path, 'r') as f:
             self.script = f.read().encode('utf-8')
+        # the replacement blob never changes, build it once
+        self.replacement = b"<script>\n" + self.script + b"</script></head>"
 
     def response(self, flow: http.HTTPFlow):
-        if flow.response and flow.response.content:
-            parsed_url = urllib.parse.urlparse(flow.request.url)
-            if parsed_url.path.endswith('AppWelcome.aspx'):
-                ctx.log.info('injecting script...')
-                flow.response.headers['X-Injected'] = 'Yes'
-                flow.response.content = flow.response.content.replace(
-                    b"</head>",
-                    b"<script>\n" + self.script + b"</script>" + b"</head>"
-                )
+        response = flow.response
+        if not response or not response.content:
+            return
+
+        # nearly every proxied response is JS/CSS/an image -- a header
+        # prefix check dismisses those before any URL handling
+        content_type = response.headers.get('content-type', '')
+        if not content_type.startswith('text/html'):
+            return
+
+        # request.path keeps the query string, strip it; no need to
+        # urlparse the absolute URL just for an endswith probe
+        path = flow.request.path.split('?', 1)[0]
+        if not path.endswith('AppWelcome.aspx'):
+            return
+
+        content = response.content
+        if b"</head>" not in content:
+            # nothing to anchor on -- skip instead of paying for a
+            # full-body copy that changes nothing
+            return
+
+        ctx.log.info('injecting script...')
+        response.headers['X-Injected'] = 'Yes'
+        response.content = content.replace(b"</head>", self.replacement, 1)
 
 
 addons = [DebugAddon(), InjectScript()]
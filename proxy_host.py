@@ -38,22 +38,22 @@ class ProxyHost:
         logger.info('mimtproxy started!')
 
     def _monitor(self):
-        while True:
-            proc = self.proc
+        # block on the process instead of polling -- wait() parks the
+        # thread until the child exits (no wakeup per second) and reports
+        # death immediately
+        proc = self.proc
+        log_path = self.log_file.name
 
-            if proc is None:
-                break
+        return_code = proc.wait()
 
-            proc.poll()
-
-            if proc.returncode is not None:
-                logger.error(
-                    'mitmdump has existed with exit code: %s (logs at %s)',
-                    proc.returncode, self.log_file.name
-                )
-                break
+        if self.proc is None:
+            # stop() was called, the exit is expected
+            return
 
-            time.sleep(1)
+        logger.error(
+            'mitmdump has existed with exit code: %s (logs at %s)',
+            return_code, log_path
+        )
 
     def stop(self):
         if self.proc is None:
@@ -62,8 +62,11 @@ class ProxyHost:
 
         logger.info('stopping mitmproxy...')
 
-        self.proc.kill()
+        # clear the handle before killing so the monitor thread treats
+        # the exit as expected
+        proc = self.proc
         self.proc = None
+        proc.kill()
         self.log_file.close()
         self.log_file = None
         logger.info('stopped')
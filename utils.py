@@ -1,13 +1,30 @@
 import time
 import logging
 import os
+import random
+from selenium.common.exceptions import (
+    NoSuchElementException,
+    WebDriverException,
+)
 from selenium.webdriver.remote.webdriver import WebDriver
-from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.support import expected_conditions
+from selenium.webdriver.support.ui import WebDriverWait
 
 logger = logging.getLogger(__name__)
 
 
-def retry(fn, retry_count: int = 3, retry_period_sec: float = 2.0):
+def wait_for(driver: WebDriver, by, value, timeout: float = 10.0):
+    """
+    Waits for the element to be present, polling frequently, and returns
+    it. Unlike the implicit wait this returns as soon as the element
+    appears and does not penalize negative lookups elsewhere.
+    """
+    return WebDriverWait(driver, timeout, poll_frequency=0.25).until(
+        expected_conditions.presence_of_element_located((by, value)))
+
+
+def retry(fn, retry_count: int = 3, base_delay_sec: float = 0.25,
+          max_delay_sec: float = 10.0):
     retry_num = 0
 
     while True:
@@ -20,19 +37,55 @@ def retry(fn, retry_count: int = 3, retry_period_sec: float = 2.0):
             retry_num += 1
 
             if retry_num <= retry_count:
-                time.sleep(retry_period_sec)
+                # exponential backoff with a pinch of jitter -- transient
+                # errors usually clear quickly (so start small), while
+                # persistent ones should not be hammered at a fixed rate
+                delay = min(max_delay_sec,
+                            base_delay_sec * 2 ** (retry_num - 1))
+                time.sleep(delay + random.uniform(0, delay * 0.5))
                 continue
 
             raise
 
 
+def select_fast(driver: WebDriver, element_id: str, visible_text: str) -> None:
+    """
+    Selects a dropdown option by its visible text with a single script
+    call.  The Select helper does it in several WebDriver round-trips
+    (find the element, enumerate the options, click the match); the
+    dispatched change event still fires any postback handlers.
+    """
+    matched = driver.execute_script(
+        "var select = document.getElementById(arguments[0]);"
+        "for (var option of select.options) {"
+        "  if (option.text.trim() === arguments[1]) {"
+        "    select.value = option.value;"
+        "    select.dispatchEvent(new Event('change', {bubbles: true}));"
+        "    return true;"
+        "  }"
+        "}"
+        "return false;",
+        element_id, visible_text)
+
+    if not matched:
+        raise NoSuchElementException(
+            'option with text "%s" not found in "%s"' % (
+                visible_text, element_id))
+
+
 def ensure_dir(path: str) -> None:
     dir_path = os.path.dirname(path)
     os.makedirs(dir_path, exist_ok=True)
 
 
 def find_element_safe(driver: WebDriver, by, value):
+    # find_elements (plural) returns an empty list for missing elements
+    # instead of raising, which avoids the exception cost on the
+    # negative probes this helper exists for; transient driver errors
+    # (e.g. a lookup racing a navigation) equally just mean "not there
+    # right now" for the callers of this helper
     try:
-        return driver.find_element(by, value)
-    except NoSuchElementException:  # spelling error making this code not work as expected
+        elements = driver.find_elements(by, value)
+    except WebDriverException:
         return None
+    return elements[0] if elements else None